@@ -1,7 +1,14 @@
+import time
+_LAUNCH_TIME = time.perf_counter()
+
+import argparse
 import dearpygui.dearpygui as dpg
-from neuroglow.ui import add_neuroglow_controls, get_neurotransmitter_values
+_DPG_IMPORTED = time.perf_counter()
+from neuroglow.ui import add_neuroglow_controls, add_deferred_controls, get_neurotransmitter_values
 from neuroglow.theme import load_fonts, create_theme
-from neuroglow.visualization import setup_canvas, update_network, tick_and_draw
+from neuroglow.visualization import setup_canvas, update_network, update_network_async, tick_and_draw
+from neuroglow.startup import StartupTimer
+_IMPORTS_DONE = time.perf_counter()
 
 # Layout constants
 SIDEBAR_WIDTH = 320
@@ -22,7 +29,8 @@ def on_viewport_resize(sender, app_data):
     dpg.configure_item("canvas_child", width=width-SIDEBAR_WIDTH, height=height)
     dpg.configure_item("neuro_canvas", width=width-SIDEBAR_WIDTH-40, height=height-40)
     # Redraw network to fit new canvas size
-    update_network(dpg.get_value("Network Size"), get_neurotransmitter_values())
+    params = get_neurotransmitter_values()
+    update_network(params["Network Size"], params)
 
 # --- Animation Callback ---
 def simulation_timer_callback():
@@ -32,32 +40,67 @@ def simulation_timer_callback():
         # Schedule next frame (~60 FPS)
         dpg.set_frame_callback(dpg.get_frame_count()+1, simulation_timer_callback)
 
+def make_first_frame_callback(timer):
+    # Runs on the first frame: report startup time, then finish the deferred work
+    def first_frame_callback():
+        timer.mark("first frame")
+        print(timer.report())
+        deferred_start = time.perf_counter()
+        load_fonts()
+        add_deferred_controls(network_size_callback=on_network_size_change, ui_scale_callback=on_ui_scale_change)
+        print(f"Deferred work after first frame: {(time.perf_counter() - deferred_start) * 1000:.1f} ms")
+        simulation_timer_callback()
+    return first_frame_callback
+
 # --- Main Entry ---
-def main():
+def main(fast_start=False):
+    timer = StartupTimer(start=_LAUNCH_TIME)
+    timer.mark("import dearpygui", at=_DPG_IMPORTED)
+    timer.mark("import neuroglow", at=_IMPORTS_DONE)
+    timer.mark("arguments")
     dpg.create_context()
-    # Load custom fonts and apply neon theme
-    load_fonts()
+    timer.mark("context")
+    # Load custom fonts and apply neon theme (fonts wait for the first frame in fast start;
+    # the main theme does not, since it paints the OLED-black background of the first frame)
+    if not fast_start:
+        load_fonts()
+        timer.mark("fonts")
     custom_theme = create_theme()
+    timer.mark("theme")
     with dpg.window(label="NeuroGlow", tag="main_window", width=START_WIDTH, height=START_HEIGHT, pos=(0,0), no_move=True, no_resize=True, no_title_bar=True):
         dpg.bind_theme(custom_theme)
         with dpg.group(horizontal=True):
             with dpg.child_window(tag="sidebar", width=SIDEBAR_WIDTH, height=START_HEIGHT, border=False):
                 dpg.add_text("Settings Sidebar", color=(255,255,0,255))  # Debug: Should always show
-                add_neuroglow_controls(network_size_callback=on_network_size_change, ui_scale_callback=on_ui_scale_change)
+                add_neuroglow_controls(network_size_callback=on_network_size_change, ui_scale_callback=on_ui_scale_change, defer_extras=fast_start)
             dpg.add_separator()
             with dpg.child_window(tag="canvas_child", width=START_WIDTH-SIDEBAR_WIDTH, height=START_HEIGHT, border=False):
                 setup_canvas(canvas_width=START_WIDTH-SIDEBAR_WIDTH-40, canvas_height=START_HEIGHT-40, as_child=True)
-    # Initialize simulation and network
-    update_network(dpg.get_value("Network Size"), get_neurotransmitter_values())
+    timer.mark("layout")
+    # Initialize simulation and network (built in the background in fast start)
+    params = get_neurotransmitter_values()
+    if fast_start:
+        update_network_async(params["Network Size"], params)
+    else:
+        update_network(params["Network Size"], params)
+        timer.mark("simulation")
     dpg.create_viewport(title="NeuroGlow", width=START_WIDTH, height=START_HEIGHT)
     dpg.setup_dearpygui()
     dpg.show_viewport()
     dpg.set_primary_window("main_window", True)
     dpg.set_viewport_resize_callback(on_viewport_resize)
+    timer.mark("viewport")
     # Start simulation animation loop
-    dpg.set_frame_callback(dpg.get_frame_count()+1, simulation_timer_callback)
+    if fast_start:
+        dpg.set_frame_callback(dpg.get_frame_count()+1, make_first_frame_callback(timer))
+    else:
+        dpg.set_frame_callback(dpg.get_frame_count()+1, simulation_timer_callback)
     dpg.start_dearpygui()
     dpg.destroy_context()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="NeuroGlow neural activity visualizer")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="Show the first frame before loading fonts, tooltips and collapsed controls, and report time to first frame")
+    args = parser.parse_args()
+    main(fast_start=args.fast_start)
@@ -0,0 +1,232 @@
+# ensemble.py
+"""
+Batched simulation engine for NeuroGlow.
+Holds K independent networks with a leading batch dimension and advances
+all of them with one vectorized step, following the same rules as Simulation.
+"""
+import math
+import numpy as np
+from neuroglow import config
+from neuroglow.simulation import NeuronState, NeuronType, NetworkMirror, STRENGTH_DECAY, DEFAULT_NEURO_PARAMS
+
+# NeuronState lookup by stored state code
+_STATES = {state.value: state for state in NeuronState}
+RESTING = NeuronState.RESTING.value
+FIRING = NeuronState.FIRING.value
+REFRACTORY = NeuronState.REFRACTORY.value
+
+
+class EnsembleMember(NetworkMirror):
+    """
+    Read-only snapshot of one ensemble member, shaped like a Simulation.
+    Exposes neurons, synapses, aps and the strength getters, which is all
+    draw_network_sim() needs. It has no step() or set_neuro_params(), so it
+    cannot drive tick_and_draw(); use visualization.tick_and_draw_ensemble()
+    or step the ensemble yourself and draw a fresh snapshot after every step.
+    """
+    def __init__(self, ensemble, member):
+        self.ensemble = ensemble
+        self.member = member
+        self.time = ensemble.time
+        self.dt = ensemble.dt
+        self.neuro_params = ensemble.neuro_params[member]
+        neuron_rows = [(x, y, _STATES[code], NeuronType.EXCITATORY if exc else NeuronType.INHIBITORY)
+                       for (x, y), code, exc in zip(ensemble.positions.tolist(),
+                                                    ensemble.state[member].tolist(),
+                                                    ensemble.excitatory[member].tolist())]
+        mask = ensemble.ap_member == member
+        self._rebuild(neuron_rows,
+                      zip(*(idx.tolist() for idx in np.nonzero(ensemble.adjacency[member]))),
+                      zip(ensemble.ap_src[mask].tolist(), ensemble.ap_tgt[mask].tolist(),
+                          ensemble.ap_progress[mask].tolist(), ensemble.ap_intensity[mask].tolist()))
+
+    def get_synaptic_strength(self, src_idx, tgt_idx):
+        return self.ensemble.get_synaptic_strength(self.member, src_idx, tgt_idx)
+
+    def get_synaptic_strength_delta(self, src_idx, tgt_idx):
+        return self.ensemble.get_synaptic_strength_delta(self.member, src_idx, tgt_idx)
+
+
+class EnsembleSimulation:
+    """
+    K independent networks of n_neurons each, stepped together.
+    neurotransmitters may be a single dict (copied to every member) or a list
+    of K dicts; each member keeps its own neuro_params afterwards.
+    """
+    def __init__(self, n_members=4, n_neurons=8, neurotransmitters=None, seed=None):
+        self.n_members = n_members
+        self.n_neurons = n_neurons
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+        self.dt = 0.016  # ~60 FPS
+        if neurotransmitters is None or isinstance(neurotransmitters, dict):
+            base = neurotransmitters or DEFAULT_NEURO_PARAMS
+            self.neuro_params = [dict(base) for _ in range(n_members)]
+        else:
+            if len(neurotransmitters) != n_members:
+                raise ValueError(f"Expected {n_members} neurotransmitter dicts, got {len(neurotransmitters)}")
+            self.neuro_params = [dict(p) for p in neurotransmitters]
+        self._build_network()
+
+    def _build_network(self):
+        k, n = self.n_members, self.n_neurons
+        # Arrange neurons in a circle, shared by all members
+        cx, cy = 400, 350
+        radius = 250
+        angles = 2 * math.pi * np.arange(n) / n
+        self.positions = np.stack([cx + np.trunc(radius * np.cos(angles)),
+                                   cy + np.trunc(radius * np.sin(angles))], axis=1).astype(np.int64)
+        # Per-member neuron state, shape (K, N)
+        self.state = np.full((k, n), RESTING, dtype=np.int8)
+        self.activation = np.zeros((k, n))
+        self.refractory_timer = np.zeros((k, n))
+        self.excitatory = self.rng.random((k, n)) < config.NEURON_EXCITATORY_PROB
+        # Random synapses: each neuron picks 2..4 distinct targets other than itself
+        scores = self.rng.random((k, n, n))
+        idx = np.arange(n)
+        scores[:, idx, idx] = np.inf
+        ranks = scores.argsort(axis=-1).argsort(axis=-1)
+        n_conn = self.rng.integers(2, min(4, n - 1), size=(k, n), endpoint=True)
+        self.adjacency = ranks < n_conn[..., None]  # (K, N, N) source -> target
+        self.synaptic_strength = np.zeros((k, n, n))
+        self.prev_synaptic_strength = np.zeros((k, n, n))
+        # Action potentials, one row per AP across all members
+        self.ap_member = np.zeros(0, dtype=np.intp)
+        self.ap_src = np.zeros(0, dtype=np.intp)
+        self.ap_tgt = np.zeros(0, dtype=np.intp)
+        self.ap_progress = np.zeros(0)
+        self.ap_intensity = np.zeros(0)
+        self._step_counter = 0
+
+    def reset(self, n_neurons=None):
+        self.n_neurons = n_neurons or self.n_neurons
+        self.time = 0.0
+        self._build_network()
+
+    def set_neuro_params(self, params, member=None):
+        """Update neuro_params of one member, or of every member when member is None."""
+        targets = self.neuro_params if member is None else [self.neuro_params[member]]
+        for p in targets:
+            p.update(params)
+
+    def _param_vector(self, name, default):
+        return np.array([float(p.get(name, default)) for p in self.neuro_params])
+
+    def _rewire_synapses(self):
+        """Prune weak and grow new synapses periodically, in every member at once."""
+        self._step_counter += 1
+        # perform rewiring every 90 steps (~1.5s)
+        if self._step_counter % 90 != 0:
+            return
+        min_syn, max_syn = 2, 4
+        adj = self.adjacency
+        # prune one random weak synapse per neuron
+        weak = adj & (self.synaptic_strength < 0.03)
+        prune = (adj.sum(axis=-1) > min_syn) & weak.any(axis=-1)
+        choice = np.where(weak, self.rng.random(adj.shape), -1.0).argmax(axis=-1)
+        k, s = np.nonzero(prune)
+        t = choice[k, s]
+        adj[k, s, t] = False
+        self.synaptic_strength[k, s, t] = 0.0
+        self.prev_synaptic_strength[k, s, t] = 0.0
+        # grow one new synapse to a random unconnected neuron
+        candidates = ~adj
+        idx = np.arange(self.n_neurons)
+        candidates[:, idx, idx] = False
+        grow = ((adj.sum(axis=-1) < max_syn)
+                & (self.rng.random(adj.shape[:2]) < 0.25)
+                & candidates.any(axis=-1))
+        choice = np.where(candidates, self.rng.random(adj.shape), -1.0).argmax(axis=-1)
+        k, s = np.nonzero(grow)
+        t = choice[k, s]
+        adj[k, s, t] = True
+        self.synaptic_strength[k, s, t] = 0.01
+        self.prev_synaptic_strength[k, s, t] = 0.01
+
+    def step(self):
+        # Parameters, one value per member
+        serotonin = self._param_vector('Serotonin', 0.5)
+        ssri = np.array([bool(p.get('SSRI Mode', False)) for p in self.neuro_params])
+        dopamine = self._param_vector('Dopamine', 0.5)
+        gaba = self._param_vector('GABA', 0.5)
+        acetylcholine = self._param_vector('Acetylcholine', 0.5)
+        endorphins = self._param_vector('Endorphins', 0.5)
+        # Decay rate modulated by serotonin and endorphins
+        base_decay = 0.03
+        decay = base_decay * (1 - 0.8 * serotonin) * (1 - 0.5 * endorphins)
+        decay = np.where(ssri, decay * 0.3, decay)
+        # dynamic rewiring logic
+        self._rewire_synapses()
+        # Update APs
+        if self.ap_member.size:
+            speed = 1.5 * (1 + 0.5 * acetylcholine)
+            self.ap_progress += self.dt * speed[self.ap_member]
+            self.ap_intensity -= decay[self.ap_member]
+            alive = (self.ap_progress < 1.0) & (self.ap_intensity > 0.05)
+            self.ap_member = self.ap_member[alive]
+            self.ap_src = self.ap_src[alive]
+            self.ap_tgt = self.ap_tgt[alive]
+            self.ap_progress = self.ap_progress[alive]
+            self.ap_intensity = self.ap_intensity[alive]
+
+        # Update neurons; masks are taken before any transition, as in Simulation
+        firing = self.state == FIRING
+        refractory = self.state == REFRACTORY
+        resting = self.state == RESTING
+        # FIRING -> REFRACTORY, initiating APs on outgoing synapses
+        self.state[firing] = REFRACTORY
+        self.refractory_timer = np.where(firing, (0.3 + 2.0 * gaba)[:, None], self.refractory_timer)
+        k, s, t = np.nonzero(firing[:, :, None] & self.adjacency)
+        if k.size:
+            self.ap_member = np.concatenate([self.ap_member, k])
+            self.ap_src = np.concatenate([self.ap_src, s])
+            self.ap_tgt = np.concatenate([self.ap_tgt, t])
+            self.ap_progress = np.concatenate([self.ap_progress, np.zeros(k.size)])
+            self.ap_intensity = np.concatenate([self.ap_intensity, np.ones(k.size)])
+        # REFRACTORY -> RESTING once the timer runs out
+        self.refractory_timer[refractory] -= self.dt
+        self.state[refractory & (self.refractory_timer <= 0)] = RESTING
+        # RESTING: passive decay, random input, threshold crossing
+        self.activation[resting] *= 0.96
+        self.activation[resting & (self.rng.random(self.state.shape) < 0.01)] += 1.0
+        fire = resting & (self.activation > (1.2 - 1.0 * dopamine)[:, None])
+        self.state[fire] = FIRING
+        self.activation[fire] = 0.0
+
+        # Hebbian plasticity: strengthen used synapses
+        np.add.at(self.synaptic_strength, (self.ap_member, self.ap_src, self.ap_tgt), 0.1)
+        np.minimum(self.synaptic_strength, 1.0, out=self.synaptic_strength)
+        # Decay all strengths
+        self.synaptic_strength *= STRENGTH_DECAY
+        # Track previous strengths for delta
+        self.prev_synaptic_strength[...] = self.synaptic_strength
+
+    def member(self, member):
+        """Return a Simulation-shaped snapshot of one member for the renderer."""
+        return EnsembleMember(self, member)
+
+    def get_visuals(self, member):
+        """
+        Returns, for one member, the same layout as Simulation.get_visuals:
+            neurons: list of (x, y, state, neuron_type)
+            aps: list of (source_pos, target_pos, progress, intensity)
+        """
+        positions = [tuple(p) for p in self.positions.tolist()]
+        neuron_visuals = [(x, y, _STATES[code], NeuronType.EXCITATORY if exc else NeuronType.INHIBITORY)
+                          for (x, y), code, exc in zip(positions,
+                                                       self.state[member].tolist(),
+                                                       self.excitatory[member].tolist())]
+        mask = self.ap_member == member
+        ap_visuals = [(positions[src], positions[tgt], progress, intensity)
+                      for src, tgt, progress, intensity in zip(self.ap_src[mask].tolist(),
+                                                               self.ap_tgt[mask].tolist(),
+                                                               self.ap_progress[mask].tolist(),
+                                                               self.ap_intensity[mask].tolist())]
+        return neuron_visuals, ap_visuals
+
+    def get_synaptic_strength(self, member, src_idx, tgt_idx):
+        return float(self.synaptic_strength[member, src_idx, tgt_idx])
+
+    def get_synaptic_strength_delta(self, member, src_idx, tgt_idx):
+        return float(self.synaptic_strength[member, src_idx, tgt_idx]
+                     - self.prev_synaptic_strength[member, src_idx, tgt_idx])
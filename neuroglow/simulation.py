@@ -5,27 +5,103 @@ Defines Neuron, Synapse, ActionPotential classes and the simulation loop.
 """
 import math
 import random
-from enum import Enum, auto
+import sys
+from array import array
+from enum import Enum, IntEnum, auto
 
 class NeuronState(Enum):
     RESTING = auto()
     FIRING = auto()
     REFRACTORY = auto()
 
+class NeuronType(IntEnum):
+    # Values double as the type codes used by the array and wire formats
+    EXCITATORY = 0
+    INHIBITORY = 1
+
+# Per-step multiplicative decay of every synaptic strength
+STRENGTH_DECAY = 0.995
+
+# Neurotransmitter levels used when none are given; copy before mutating
+DEFAULT_NEURO_PARAMS = {
+    'Serotonin': 0.5,
+    'Dopamine': 0.5,
+    'GABA': 0.5,
+    'SSRI Mode': False,
+    'Acetylcholine': 0.5,
+    'Endorphins': 0.5,
+}
+
+
+def _read_only(np, buffer, dtype):
+    # Zero-copy numpy view over an array.array mirror
+    view = np.frombuffer(buffer, dtype=dtype)
+    view.flags.writeable = False
+    return view
+
+
+class VisualFrame:
+    """
+    Read-only array views returned by Simulation.get_visual_arrays().
+    positions (N, 2), states (N,) NeuronState values and types (N,) type codes
+    share memory with the simulation. ap_synapse indexes sim.synapses (-1 for
+    an AP still travelling on a pruned synapse). dirty_neurons holds neuron ids
+    and dirty_synapses (src_idx, tgt_idx) keys changed since the previous call.
+    """
+    def __init__(self, positions, states, types, ap_synapse, ap_progress, ap_intensity,
+                 dirty_neurons, dirty_synapses):
+        self.positions = positions
+        self.states = states
+        self.types = types
+        self.ap_synapse = ap_synapse
+        self.ap_progress = ap_progress
+        self.ap_intensity = ap_intensity
+        self.dirty_neurons = dirty_neurons
+        self.dirty_synapses = dirty_synapses
+
+
+class ChangeTracker:
+    """
+    Neuron ids and (src_idx, tgt_idx) synapse keys changed since the last take():
+    state transitions, rewiring, and synapses that carried or dropped an AP.
+    Strength decay alone does not count as a change. rebuilt is set when the
+    whole network was (re)built. Register one per consumer with
+    Simulation.track_changes().
+    """
+    def __init__(self):
+        self.rebuilt = False
+        self.neurons = set()
+        self.synapses = set()
+
+    def take(self):
+        """Return (rebuilt, neurons, synapses) and start a new change set."""
+        changes = (self.rebuilt, self.neurons, self.synapses)
+        self.rebuilt = False
+        self.neurons = set()
+        self.synapses = set()
+        return changes
+
+
 class ActionPotential:
+    __slots__ = ('synapse', 'progress', 'intensity')
+
     def __init__(self, synapse, progress=0.0, intensity=1.0):
         self.synapse = synapse  # Reference to Synapse
         self.progress = progress  # 0.0 (source) to 1.0 (target)
         self.intensity = intensity  # For glow/decay effects
 
 class Synapse:
+    __slots__ = ('source', 'target', 'aps')
+
     def __init__(self, source, target):
         self.source = source  # Neuron object
         self.target = target  # Neuron object
         self.aps = []  # List of ActionPotentials currently propagating
 
 class Neuron:
-    def __init__(self, nid, position):
+    __slots__ = ('id', 'position', 'state', 'activation', 'refractory_timer', 'out_synapses', 'neuron_type')
+
+    def __init__(self, nid, position, neuron_type=None):
         self.id = nid
         self.position = position  # (x, y)
         self.state = NeuronState.RESTING
@@ -33,7 +109,57 @@ class Neuron:
         self.refractory_timer = 0.0
         self.out_synapses = []  # List of Synapse objects
         # Assign neuron type: excitatory (80%) or inhibitory (20%)
-        self.neuron_type = "excitatory" if random.random() < 0.8 else "inhibitory"
+        if neuron_type is None:
+            neuron_type = NeuronType.EXCITATORY if random.random() < 0.8 else NeuronType.INHIBITORY
+        self.neuron_type = neuron_type
+
+def network_visuals(neurons, aps):
+    """get_visuals() layout shared by Simulation and NetworkMirror."""
+    neuron_visuals = [(n.position[0], n.position[1], n.state, n.neuron_type) for n in neurons]
+    ap_visuals = []
+    for ap in aps:
+        src = ap.synapse.source.position
+        tgt = ap.synapse.target.position
+        ap_visuals.append((src, tgt, ap.progress, ap.intensity))
+    return neuron_visuals, ap_visuals
+
+
+class NetworkMirror:
+    """
+    Simulation-shaped copy of a network rebuilt from plain rows, so that
+    draw_network_sim() can render state that does not live in a Simulation
+    (ensemble members, remote viewers). Subclasses call _rebuild() and provide
+    get_synaptic_strength() and get_synaptic_strength_delta().
+    """
+    def _rebuild(self, neuron_rows, synapse_keys, ap_rows):
+        """
+        neuron_rows: (x, y, NeuronState, NeuronType) in neuron id order
+        synapse_keys: (src_idx, tgt_idx) pairs
+        ap_rows: (src_idx, tgt_idx, progress, intensity)
+        """
+        self.neurons = []
+        for nid, (x, y, state, neuron_type) in enumerate(neuron_rows):
+            neuron = Neuron(nid, (x, y), neuron_type=neuron_type)
+            neuron.state = state
+            self.neurons.append(neuron)
+        self.synapses = []
+        lookup = {}
+        for src, tgt in synapse_keys:
+            syn = Synapse(self.neurons[src], self.neurons[tgt])
+            self.neurons[src].out_synapses.append(syn)
+            self.synapses.append(syn)
+            lookup[(src, tgt)] = syn
+        self.aps = []
+        for src, tgt, progress, intensity in ap_rows:
+            # APs keep travelling on synapses pruned after they were fired
+            syn = lookup.get((src, tgt)) or Synapse(self.neurons[src], self.neurons[tgt])
+            ap = ActionPotential(synapse=syn, progress=progress, intensity=intensity)
+            syn.aps.append(ap)
+            self.aps.append(ap)
+
+    def get_visuals(self):
+        return network_visuals(self.neurons, self.aps)
+
 
 class Simulation:
     def __init__(self, n_neurons=8, neurotransmitters=None):
@@ -42,16 +168,13 @@ class Simulation:
         self.aps = []  # All APs in the network
         self.time = 0.0
         self.dt = 0.016  # ~60 FPS
-        self.neuro_params = neurotransmitters or {
-            'Serotonin': 0.5,
-            'Dopamine': 0.5,
-            'GABA': 0.5,
-            'SSRI Mode': False,
-            'Acetylcholine': 0.5,
-            'Endorphins': 0.5,
-        }
+        self.neuro_params = neurotransmitters or dict(DEFAULT_NEURO_PARAMS)
         self.synaptic_strength = {}  # (src_idx, tgt_idx) -> float
         self.prev_synaptic_strength = {}  # (src_idx, tgt_idx) -> float
+        self._ap_pool = []  # Retired ActionPotentials available for reuse
+        self.steps = 0  # Number of step() calls
+        self._trackers = []
+        self._visual_changes = self.track_changes()
         self._build_network(n_neurons)
 
     def _build_network(self, n):
@@ -73,6 +196,15 @@ class Simulation:
                 syn = Synapse(neuron, target)
                 neuron.out_synapses.append(syn)
                 self.synapses.append(syn)
+        # Array mirrors for get_visual_arrays(); plain array.array so numpy is
+        # only imported once the array API is used. Everything starts dirty.
+        self._positions = array('i', [c for neuron in self.neurons for c in neuron.position])
+        self._state_codes = array('b', [neuron.state.value for neuron in self.neurons])
+        self._type_codes = array('b', [neuron.neuron_type for neuron in self.neurons])
+        for tracker in self._trackers:
+            self._mark_all(tracker)
+        self._synapse_index = None
+        self._ap_frame = None
 
     def reset(self, n_neurons=None):
         self.neurons.clear()
@@ -106,6 +238,8 @@ class Simulation:
                 key = (syn_to_remove.source.id, syn_to_remove.target.id)
                 self.synaptic_strength.pop(key, None)
                 self.prev_synaptic_strength.pop(key, None)
+                self._mark_synapse(key)
+                self._synapse_index = None
             # grow new synapses
             if len(neuron.out_synapses) < max_syn and random.random() < 0.25:
                 targets = [n for n in self.neurons if n is not neuron
@@ -118,6 +252,8 @@ class Simulation:
                     key = (neuron.id, target.id)
                     self.synaptic_strength[key] = 0.01
                     self.prev_synaptic_strength[key] = 0.01
+                    self._mark_synapse(key)
+                    self._synapse_index = None
 
     def step(self):
         # Parameters
@@ -132,6 +268,7 @@ class Simulation:
         decay = base_decay * (1 - 0.8 * serotonin) * (1 - 0.5 * endorphins)
         if ssri:
             decay *= 0.3
+        self.steps += 1
         # dynamic rewiring logic
         self._rewire_synapses()
         # Update APs
@@ -143,21 +280,27 @@ class Simulation:
             if ap.progress >= 1.0 or ap.intensity <= 0.05:
                 ap.synapse.aps.remove(ap)
                 self.aps.remove(ap)
+                self._mark_synapse((ap.synapse.source.id, ap.synapse.target.id))
+                # Drop the synapse reference so pruned synapses can be freed
+                ap.synapse = None
+                self._ap_pool.append(ap)
 
         # Update neurons
         for neuron in self.neurons:
             if neuron.state == NeuronState.FIRING:
                 neuron.state = NeuronState.REFRACTORY
+                self._set_state_code(neuron)
                 neuron.refractory_timer = 0.3 + 2.0 * gaba    # Range: 0.3s (low GABA) to 2.3s (high)
                 # Initiate APs on outgoing synapses
                 for syn in neuron.out_synapses:
-                    ap = ActionPotential(synapse=syn, progress=0.0, intensity=1.0)
+                    ap = self._new_action_potential(syn)
                     syn.aps.append(ap)
                     self.aps.append(ap)
             elif neuron.state == NeuronState.REFRACTORY:
                 neuron.refractory_timer -= self.dt
                 if neuron.refractory_timer <= 0:
                     neuron.state = NeuronState.RESTING
+                    self._set_state_code(neuron)
             elif neuron.state == NeuronState.RESTING:
                 # Passive decay
                 neuron.activation *= 0.96
@@ -167,6 +310,7 @@ class Simulation:
                 if neuron.activation > 1.2 - 1.0 * dopamine:  # Range: 1.2 (low dopamine) to 0.2 (high)
                     neuron.state = NeuronState.FIRING
                     neuron.activation = 0.0
+                    self._set_state_code(neuron)
 
         # Hebbian plasticity: strengthen used synapses
         for ap in self.aps:
@@ -174,9 +318,10 @@ class Simulation:
             tgt_idx = ap.synapse.target.id
             key = (src_idx, tgt_idx)
             self.synaptic_strength[key] = min(1.0, self.synaptic_strength.get(key, 0.0) + 0.1)
+            self._mark_synapse(key)
         # Decay all strengths
         for key in self.synaptic_strength:
-            self.synaptic_strength[key] *= 0.995
+            self.synaptic_strength[key] *= STRENGTH_DECAY
         # Track previous strengths for delta
         self.prev_synaptic_strength = self.prev_synaptic_strength if hasattr(self, 'prev_synaptic_strength') else {}
         for key in self.synaptic_strength:
@@ -188,13 +333,114 @@ class Simulation:
             neurons: list of (x, y, state, neuron_type)
             aps: list of (source_pos, target_pos, progress, intensity)
         """
-        neuron_visuals = [(n.position[0], n.position[1], n.state, n.neuron_type) for n in self.neurons]
-        ap_visuals = []
-        for ap in self.aps:
-            src = ap.synapse.source.position
-            tgt = ap.synapse.target.position
-            ap_visuals.append((src, tgt, ap.progress, ap.intensity))
-        return neuron_visuals, ap_visuals
+        return network_visuals(self.neurons, self.aps)
+
+    def _new_action_potential(self, synapse):
+        if not self._ap_pool:
+            return ActionPotential(synapse=synapse, progress=0.0, intensity=1.0)
+        ap = self._ap_pool.pop()
+        ap.synapse = synapse
+        ap.progress = 0.0
+        ap.intensity = 1.0
+        return ap
+
+    def memory_usage(self):
+        """
+        Approximate resident bytes per neuron, synapse and AP, counting each
+        object with the containers and floats it owns. Strength dict entries are
+        charged to synapses. bytes_per_ap is measured on one representative
+        instance (live, pooled or new), so it is known even when no AP is live.
+        total_bytes also covers pooled APs, the array mirrors and change sets.
+        """
+        def size(obj):
+            # Classes without __slots__ also pay for their instance __dict__
+            instance_dict = getattr(obj, '__dict__', None)
+            return sys.getsizeof(obj) + (sys.getsizeof(instance_dict) if instance_dict is not None else 0)
+
+        def average(total, count):
+            return total / count if count else 0.0
+
+        neuron_bytes = sum(size(n) + sys.getsizeof(n.position) + sys.getsizeof(n.out_synapses)
+                           + sys.getsizeof(n.activation) + sys.getsizeof(n.refractory_timer)
+                           for n in self.neurons)
+        strength_bytes = sum(sys.getsizeof(key) + sys.getsizeof(value)
+                             for key, value in self.synaptic_strength.items())
+        strength_bytes += sys.getsizeof(self.synaptic_strength) + sys.getsizeof(self.prev_synaptic_strength)
+        synapse_bytes = sum(size(syn) + sys.getsizeof(syn.aps) for syn in self.synapses) + strength_bytes
+        sample = self.aps[0] if self.aps else self._ap_pool[0] if self._ap_pool else ActionPotential(synapse=None)
+        per_ap = size(sample) + sys.getsizeof(sample.progress) + sys.getsizeof(sample.intensity)
+        ap_bytes = per_ap * len(self.aps) + sys.getsizeof(self.aps)
+        pool_bytes = per_ap * len(self._ap_pool) + sys.getsizeof(self._ap_pool)
+        mirror_bytes = (sys.getsizeof(self._positions) + sys.getsizeof(self._state_codes)
+                        + sys.getsizeof(self._type_codes))
+        if self._synapse_index is not None:
+            mirror_bytes += sys.getsizeof(self._synapse_index)
+        if self._ap_frame is not None:
+            mirror_bytes += sum(ap_array.nbytes for ap_array in self._ap_frame[1:])
+        mirror_bytes += sum(sys.getsizeof(t.neurons) + sys.getsizeof(t.synapses) for t in self._trackers)
+        return {
+            'neurons': len(self.neurons),
+            'synapses': len(self.synapses),
+            'aps': len(self.aps),
+            'pooled_aps': len(self._ap_pool),
+            'bytes_per_neuron': average(neuron_bytes, len(self.neurons)),
+            'bytes_per_synapse': average(synapse_bytes, len(self.synapses)),
+            'bytes_per_ap': per_ap,
+            'ap_pool_bytes': pool_bytes,
+            'mirror_bytes': mirror_bytes,
+            'total_bytes': neuron_bytes + synapse_bytes + ap_bytes + pool_bytes + mirror_bytes,
+        }
+
+    def track_changes(self):
+        """Register and return a ChangeTracker that starts out with everything marked."""
+        tracker = ChangeTracker()
+        self._mark_all(tracker)
+        self._trackers.append(tracker)
+        return tracker
+
+    def untrack_changes(self, tracker):
+        self._trackers.remove(tracker)
+
+    def _mark_all(self, tracker):
+        tracker.rebuilt = True
+        tracker.neurons.update(range(len(self.neurons)))
+        tracker.synapses.update((syn.source.id, syn.target.id) for syn in self.synapses)
+
+    def _mark_synapse(self, key):
+        for tracker in self._trackers:
+            tracker.synapses.add(key)
+
+    def _set_state_code(self, neuron):
+        self._state_codes[neuron.id] = neuron.state.value
+        for tracker in self._trackers:
+            tracker.neurons.add(neuron.id)
+
+    def get_visual_arrays(self):
+        """
+        Array counterpart of get_visuals() that allocates no per-neuron or
+        per-AP tuples. Returns a VisualFrame; its dirty sets cover changes since
+        the previous call (strength decay alone does not mark a synapse dirty).
+        Imports numpy on first use.
+        """
+        import numpy as np
+        if self._synapse_index is None:
+            self._synapse_index = {syn: i for i, syn in enumerate(self.synapses)}
+        # AP arrays are rebuilt at most once per step
+        if self._ap_frame is None or self._ap_frame[0] != self.steps:
+            count = len(self.aps)
+            index = self._synapse_index
+            self._ap_frame = (
+                self.steps,
+                np.fromiter((index.get(ap.synapse, -1) for ap in self.aps), dtype=np.int32, count=count),
+                np.fromiter((ap.progress for ap in self.aps), dtype=np.float64, count=count),
+                np.fromiter((ap.intensity for ap in self.aps), dtype=np.float64, count=count),
+            )
+            for ap_array in self._ap_frame[1:]:
+                ap_array.flags.writeable = False
+        _, dirty_neurons, dirty_synapses = self._visual_changes.take()
+        return VisualFrame(_read_only(np, self._positions, np.int32).reshape(-1, 2),
+                           _read_only(np, self._state_codes, np.int8), _read_only(np, self._type_codes, np.int8),
+                           *self._ap_frame[1:], dirty_neurons=frozenset(dirty_neurons), dirty_synapses=frozenset(dirty_synapses))
 
     def get_synaptic_strength(self, src_idx, tgt_idx):
         return self.synaptic_strength.get((src_idx, tgt_idx), 0.0)
@@ -0,0 +1,30 @@
+# startup.py
+"""
+Startup timing for NeuroGlow.
+Records named phases from process launch to the first rendered frame.
+"""
+import time
+
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []  # List of (name, seconds)
+
+    def mark(self, name, at=None):
+        """Close the current phase under the given name, at a recorded perf_counter() time or now."""
+        now = at if at is not None else time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self, title="Time to first frame"):
+        """Return a printable per-phase breakdown in milliseconds."""
+        width = max([len(name) for name, _ in self.phases] + [5])
+        lines = [f"{title}: {self.total() * 1000:.1f} ms"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
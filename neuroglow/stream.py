@@ -0,0 +1,523 @@
+# stream.py
+"""
+Snapshot streaming for NeuroGlow.
+SnapshotServer streams Simulation state to remote viewers over TCP as
+delta-encoded binary frames; RemoteSimulation rebuilds a Simulation-shaped
+mirror on the viewer side that draw_network_sim() can render.
+
+Wire format: every frame is a little-endian u32 length followed by a header
+and four record blocks (neuron updates, removed synapses, synapse updates,
+action potentials). Changes come from the simulation's own ChangeTracker:
+a neuron is sent when it changed state, a synapse when it was rewired or
+carried an AP (the Hebbian bump). Strength decay is deterministic, so the
+viewer applies STRENGTH_DECAY itself for every step between frames. APs are
+sent in full. Both per-frame CPU and bandwidth follow activity rather than
+network size; only keyframes (new viewer, rebuilt network) walk everything.
+"""
+import argparse
+import asyncio
+import queue
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from neuroglow.simulation import Simulation, NeuronState, NeuronType, NetworkMirror, STRENGTH_DECAY
+
+DEFAULT_PORT = 7341
+MAGIC = b"NG"
+VERSION = 3
+FLAG_KEYFRAME = 0x01
+VIEWER_WINDOW_TAG = "viewer_window"
+
+_LENGTH = struct.Struct("<I")
+# magic, version, flags, seq, steps, time, n_neurons, neuron updates, removed synapses, synapse updates, aps
+_HEADER = struct.Struct("<2sBBIIfIIIII")
+# Records carry neuron ids as u16; counts in the header are u32
+MAX_NEURONS = 0x10000
+_NEURON = struct.Struct("<HBBhh")  # id, state, type, x, y
+_SYN_REMOVED = struct.Struct("<HH")  # src, tgt
+_SYN_UPDATE = struct.Struct("<HHH")  # src, tgt, strength
+_AP = struct.Struct("<HHHB")  # src, tgt, progress, intensity
+
+_STATES = {state.value: state for state in NeuronState}
+
+
+def _quantize(value, scale):
+    return int(round(min(max(value, 0.0), 1.0) * scale))
+
+
+def _has_synapse(sim, src, tgt):
+    return src < len(sim.neurons) and any(syn.target.id == tgt for syn in sim.neurons[src].out_synapses)
+
+
+def encode_frame(sim, seq, keyframe, neuron_ids, synapse_keys):
+    """
+    Encode the current state of sim as one frame. neuron_ids and synapse_keys
+    are the entries changed since the client's previous frame; a keyframe
+    sends everything instead. Synapse keys no longer in the network are
+    encoded as removals.
+    """
+    if keyframe:
+        neuron_ids = range(len(sim.neurons))
+        synapse_keys = [(syn.source.id, syn.target.id) for syn in sim.synapses]
+    neurons = []
+    for nid in neuron_ids:
+        if nid < len(sim.neurons):
+            neuron = sim.neurons[nid]
+            neurons.append(_NEURON.pack(nid, neuron.state.value, neuron.neuron_type,
+                                        neuron.position[0], neuron.position[1]))
+    removed = []
+    updated = []
+    for src, tgt in synapse_keys:
+        if _has_synapse(sim, src, tgt):
+            updated.append(_SYN_UPDATE.pack(src, tgt, _quantize(sim.get_synaptic_strength(src, tgt), 65535)))
+        elif not keyframe:
+            removed.append(_SYN_REMOVED.pack(src, tgt))
+    aps = [_AP.pack(ap.synapse.source.id, ap.synapse.target.id,
+                    _quantize(ap.progress, 65535), _quantize(ap.intensity, 255))
+           for ap in sim.aps]
+    header = _HEADER.pack(MAGIC, VERSION, FLAG_KEYFRAME if keyframe else 0, seq, sim.steps & 0xFFFFFFFF,
+                          sim.time, len(sim.neurons), len(neurons), len(removed), len(updated), len(aps))
+    return b"".join([header] + neurons + removed + updated + aps)
+
+
+class _Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.wakeup = asyncio.Event()
+        self.keyframe = True
+        self.dirty_neurons = set()
+        self.dirty_synapses = set()
+        self.last_seq = None
+        self.sender = None
+        self.sent = 0
+        self.dropped = 0
+
+
+class SnapshotServer:
+    """
+    Streams Simulation state to every connected viewer.
+    publish() never waits on the network and only touches what changed: each
+    client accumulates the changed neuron ids and synapse keys until its
+    sender is free, then one frame is encoded from the live simulation. A slow
+    viewer therefore skips frames instead of stalling the simulation.
+    """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, write_buffer_limit=64 * 1024, send_buffer_size=None):
+        self.host = host
+        self.port = port
+        self.write_buffer_limit = write_buffer_limit
+        # Optional SO_SNDBUF cap, so less stale data queues in the kernel
+        self.send_buffer_size = send_buffer_size
+        self.clients = set()
+        self._server = None
+        self._sim = None
+        self._changes = None
+        self._seq = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # Pick up the real port when started with port=0
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Stopping the senders lets every connection handler return
+        for client in list(self.clients):
+            client.sender.cancel()
+        while self.clients:
+            await asyncio.sleep(0)
+        if self._sim is not None:
+            self._sim.untrack_changes(self._changes)
+            self._sim = None
+
+    def publish(self, sim):
+        """Collect the simulation's changes and wake every client; call from the event loop thread."""
+        if len(sim.neurons) > MAX_NEURONS:
+            raise ValueError(f"Cannot stream {len(sim.neurons)} neurons; the wire format allows at most {MAX_NEURONS}")
+        if sim is not self._sim:
+            if self._sim is not None:
+                self._sim.untrack_changes(self._changes)
+            self._sim = sim
+            self._changes = sim.track_changes()
+        rebuilt, neurons, synapses = self._changes.take()
+        for client in self.clients:
+            if rebuilt:
+                client.keyframe = True
+            else:
+                client.dirty_neurons |= neurons
+                client.dirty_synapses |= synapses
+        self._seq += 1
+        for client in self.clients:
+            client.wakeup.set()
+
+    async def _handle_client(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+        if self.send_buffer_size is not None:
+            writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+        client = _Client(writer)
+        self.clients.add(client)
+        if self._sim is not None:
+            client.wakeup.set()
+        sender = client.sender = asyncio.ensure_future(self._send_loop(client))
+        # Viewers send nothing; read() returns once they disconnect
+        closed = asyncio.ensure_future(reader.read())
+        try:
+            await asyncio.wait([sender, closed], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            closed.cancel()
+            self.clients.discard(client)
+            writer.close()
+
+    async def _send_loop(self, client):
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+                payload = encode_frame(self._sim, self._seq, client.keyframe,
+                                       client.dirty_neurons, client.dirty_synapses)
+                if client.last_seq is not None:
+                    client.dropped += self._seq - client.last_seq - 1
+                client.last_seq = self._seq
+                client.keyframe = False
+                client.dirty_neurons = set()
+                client.dirty_synapses = set()
+                client.writer.write(_LENGTH.pack(len(payload)) + payload)
+                client.sent += 1
+                # Changes keep accumulating in the client state while we wait here
+                await client.writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def read_frame(reader):
+    """Read one length-prefixed frame payload from a StreamReader."""
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+class RemoteSimulation(NetworkMirror):
+    """
+    Viewer-side mirror of a streamed Simulation.
+    Feed every received payload to apply_frame() in order, then call refresh()
+    to rebuild the neurons, synapses and aps used by draw_network_sim().
+    """
+    def __init__(self):
+        self.time = 0.0
+        self.seq = None
+        self.steps = None
+        self.neuron_state = {}  # id -> (state, type, x, y)
+        self.synapse_state = {}  # (src_idx, tgt_idx) -> strength
+        self.ap_state = []
+        self.neurons = []
+        self.synapses = []
+        self.aps = []
+
+    def apply_frame(self, payload):
+        magic, version, flags, seq, steps, t, n_neurons, n_updates, n_removed, n_syn, n_aps = _HEADER.unpack_from(payload)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported frame (magic={magic!r}, version={version})")
+        if flags & FLAG_KEYFRAME:
+            self.neuron_state.clear()
+            self.synapse_state.clear()
+        elif self.steps is not None and steps != self.steps:
+            # Replay the strength decay of the steps since the previous frame
+            decay = STRENGTH_DECAY ** ((steps - self.steps) & 0xFFFFFFFF)
+            for key in self.synapse_state:
+                self.synapse_state[key] *= decay
+        self.seq = seq
+        self.steps = steps
+        self.time = t
+        offset = _HEADER.size
+        for _ in range(n_updates):
+            nid, state, ntype, x, y = _NEURON.unpack_from(payload, offset)
+            self.neuron_state[nid] = (state, ntype, x, y)
+            offset += _NEURON.size
+        for _ in range(n_removed):
+            self.synapse_state.pop(_SYN_REMOVED.unpack_from(payload, offset), None)
+            offset += _SYN_REMOVED.size
+        for _ in range(n_syn):
+            src, tgt, strength = _SYN_UPDATE.unpack_from(payload, offset)
+            self.synapse_state[(src, tgt)] = strength / 65535
+            offset += _SYN_UPDATE.size
+        self.ap_state = []
+        for _ in range(n_aps):
+            src, tgt, progress, intensity = _AP.unpack_from(payload, offset)
+            self.ap_state.append((src, tgt, progress / 65535, intensity / 255))
+            offset += _AP.size
+
+    def refresh(self):
+        """Rebuild Simulation-shaped objects from the mirrored state."""
+        neuron_rows = []
+        for nid in sorted(self.neuron_state):
+            state, ntype, x, y = self.neuron_state[nid]
+            neuron_rows.append((x, y, _STATES[state], NeuronType(ntype)))
+        self._rebuild(neuron_rows, self.synapse_state, self.ap_state)
+
+    def get_synaptic_strength(self, src_idx, tgt_idx):
+        return self.synapse_state.get((src_idx, tgt_idx), 0.0)
+
+    def get_synaptic_strength_delta(self, src_idx, tgt_idx):
+        # Simulation copies prev_synaptic_strength at the end of every step,
+        # so its delta is always 0 and is not sent
+        return 0.0
+
+
+async def serve(n_neurons=8, host="127.0.0.1", port=DEFAULT_PORT, fps=60):
+    """Run a Simulation and stream it until cancelled."""
+    sim = Simulation(n_neurons=n_neurons)
+    server = await SnapshotServer(host, port).start()
+    print(f"NeuroGlow streaming {n_neurons} neurons on {server.host}:{server.port}")
+    frame_time = 1.0 / fps
+    try:
+        while True:
+            started = time.perf_counter()
+            sim.step()
+            server.publish(sim)
+            await asyncio.sleep(max(0.0, frame_time - (time.perf_counter() - started)))
+    finally:
+        await server.close()
+
+
+async def _receive_frames(host, port, frames):
+    """Put every received payload on frames, then the ConnectionError that ended the stream."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as exc:
+        frames.put(ConnectionError(f"Could not connect to {host}:{port}: {exc}"))
+        return
+    try:
+        while True:
+            frames.put(await read_frame(reader))
+    except asyncio.IncompleteReadError:
+        frames.put(ConnectionError(f"{host}:{port} closed the connection"))
+    except OSError as exc:
+        frames.put(ConnectionError(f"Lost connection to {host}:{port}: {exc}"))
+    finally:
+        writer.close()
+
+
+def mirror_mismatches(sim, remote, tolerance=1e-4):
+    """Return a list of differences between a Simulation and a RemoteSimulation mirror."""
+    remote.refresh()
+    problems = []
+    local_neurons = [(n.position, n.state, n.neuron_type) for n in sim.neurons]
+    if local_neurons != [(n.position, n.state, n.neuron_type) for n in remote.neurons]:
+        problems.append("neuron states differ")
+    local_keys = sorted((syn.source.id, syn.target.id) for syn in sim.synapses)
+    if local_keys != sorted((syn.source.id, syn.target.id) for syn in remote.synapses):
+        problems.append("synapses differ")
+    else:
+        worst = max([abs(sim.get_synaptic_strength(*key) - remote.get_synaptic_strength(*key)) for key in local_keys] + [0.0])
+        if worst > tolerance:
+            problems.append(f"strength off by {worst:.2e}")
+    if len(sim.aps) != len(remote.aps):
+        problems.append(f"{len(remote.aps)} APs mirrored, {len(sim.aps)} live")
+    return problems
+
+
+async def _consume(reader, remote, stats):
+    while True:
+        payload = await read_frame(reader)
+        remote.apply_frame(payload)
+        stats.append(len(payload))
+
+
+async def _check_disconnect_reports():
+    server = await SnapshotServer(port=0).start()
+    frames = queue.SimpleQueue()
+    receiver = asyncio.ensure_future(_receive_frames(server.host, server.port, frames))
+    while not server.clients:
+        await asyncio.sleep(0)
+    await server.close()
+    await receiver
+    # Nothing listens on the port any more, so the next connect is refused
+    await _receive_frames(server.host, server.port, frames)
+    reports = []
+    while not frames.empty():
+        reports.append(frames.get_nowait())
+    errors = [item for item in reports if isinstance(item, ConnectionError)]
+    if len(errors) != 2:
+        return [f"expected 2 connection errors, got {len(errors)}"]
+    return []
+
+
+async def selftest(n_neurons=200, steps=300, seed=0):
+    """
+    Loopback check of the server: one viewer reads every frame, the other
+    stops reading for the whole run on a small receive buffer, so it has to
+    skip frames. Both mirrors must match the simulation once drained, and
+    the fast mirror must draw in the viewer layout. Finally the receiver must
+    report a dropped and a refused connection.
+    """
+    random.seed(seed)
+    sim = Simulation(n_neurons=n_neurons)
+    server = await SnapshotServer(port=0, write_buffer_limit=1024, send_buffer_size=4096).start()
+    viewers = []
+    for name in ("fast", "paused"):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if name == "paused":
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect((server.host, server.port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        viewers.append((name, reader, writer, RemoteSimulation(), []))
+    while len(server.clients) < len(viewers):
+        await asyncio.sleep(0)
+    # The paused viewer reads nothing until the run is over
+    viewers[1][2].transport.pause_reading()
+    consumers = [asyncio.ensure_future(_consume(viewers[0][1], viewers[0][3], viewers[0][4]))]
+    for _ in range(steps):
+        sim.step()
+        server.publish(sim)
+        await asyncio.sleep(0)
+    viewers[1][2].transport.resume_reading()
+    consumers.append(asyncio.ensure_future(_consume(viewers[1][1], viewers[1][3], viewers[1][4])))
+    # Wait until both viewers hold the latest frame
+    deadline = time.perf_counter() + 10.0
+    while any(remote.seq != server._seq for _, _, _, remote, _ in viewers) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    ok = True
+    for (name, _, writer, remote, stats), consumer in zip(viewers, consumers):
+        consumer.cancel()
+        problems = mirror_mismatches(sim, remote)
+        if name == "paused" and len(stats) >= steps:
+            problems.append("paused viewer never skipped a frame")
+        ok = ok and not problems
+        print(f"{name:>6}: {len(stats)} frames, {steps - len(stats)} skipped, "
+              f"{sum(stats) / max(len(stats), 1):.0f} bytes/frame, "
+              f"{'OK' if not problems else '; '.join(problems)}")
+        writer.close()
+    await server.close()
+    # A viewer must hear about a dropped and a refused connection
+    problems = await _check_disconnect_reports()
+    ok = ok and not problems
+    print(f"  disconnect: {'OK' if not problems else '; '.join(problems)}")
+    # The fast mirror must also draw in the viewer layout
+    drawn = check_viewer_draw(viewers[0][3])
+    if drawn is None:
+        print("  draw: skipped, dearpygui is not installed")
+    else:
+        ok = ok and drawn > 0
+        print(f"  draw: {drawn} items, {'OK' if drawn else 'nothing drawn'}")
+    return ok
+
+
+def build_viewer(canvas_width=800, canvas_height=700):
+    """Create the viewer window holding the shared canvas; needs a current dpg context."""
+    import dearpygui.dearpygui as dpg
+    from neuroglow import visualization
+    with dpg.window(label="NeuroGlow Viewer", tag=VIEWER_WINDOW_TAG, no_move=True, no_resize=True, no_title_bar=True):
+        visualization.setup_canvas(canvas_width, canvas_height, as_child=True)
+    return VIEWER_WINDOW_TAG
+
+
+def draw_remote(remote):
+    """Rebuild the mirror and draw it with draw_network_sim()."""
+    from neuroglow import visualization
+    remote.refresh()
+    visualization.sim = remote
+    visualization.draw_network_sim()
+
+
+def check_viewer_draw(remote, canvas_width=800, canvas_height=700):
+    """
+    Build the viewer layout in a scratch context and draw remote into it.
+    Returns the number of items drawn, or None when dearpygui is not installed.
+    """
+    try:
+        import dearpygui.dearpygui as dpg
+    except ImportError:
+        return None
+    from neuroglow import visualization
+    dpg.create_context()
+    try:
+        build_viewer(canvas_width, canvas_height)
+        draw_remote(remote)
+        return len(dpg.get_item_children(visualization.CANVAS_TAG, 2))
+    finally:
+        dpg.destroy_context()
+
+
+def _show_disconnect(message):
+    import dearpygui.dearpygui as dpg
+    from neuroglow import visualization
+    dpg.draw_text((20, 20), message, color=(255, 90, 90, 255), size=18, parent=visualization.CANVAS_TAG)
+
+
+def view(host="127.0.0.1", port=DEFAULT_PORT, canvas_width=800, canvas_height=700):
+    """
+    Thin viewer: receive frames on a background thread and draw them with
+    draw_network_sim(). Returns the ConnectionError that ended the stream,
+    which also stays on the canvas until the window is closed, or None.
+    """
+    import dearpygui.dearpygui as dpg
+    frames = queue.SimpleQueue()
+    receiver = threading.Thread(target=lambda: asyncio.run(_receive_frames(host, port, frames)), daemon=True)
+    receiver.start()
+    remote = RemoteSimulation()
+    disconnected = None
+    dpg.create_context()
+    dpg.create_viewport(title="NeuroGlow Viewer", width=canvas_width + 40, height=canvas_height + 40)
+    build_viewer(canvas_width, canvas_height)
+    dpg.setup_dearpygui()
+    dpg.show_viewport()
+    dpg.set_primary_window(VIEWER_WINDOW_TAG, True)
+    while dpg.is_dearpygui_running():
+        # Deltas build on each other, so every received frame must be applied
+        received = False
+        lost = None
+        while disconnected is None:
+            try:
+                item = frames.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, ConnectionError):
+                disconnected = lost = item
+            else:
+                remote.apply_frame(item)
+                received = True
+        if received:
+            draw_remote(remote)
+        if lost is not None:
+            # Nothing redraws the canvas after this, so the message stays
+            print(lost, file=sys.stderr)
+            _show_disconnect(str(lost))
+        dpg.render_dearpygui_frame()
+    dpg.destroy_context()
+    return disconnected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream NeuroGlow simulations to remote viewers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="Run a simulation and stream it")
+    serve_parser.add_argument("--neurons", type=int, default=8)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--fps", type=float, default=60)
+    view_parser = sub.add_parser("view", help="Display a streamed simulation")
+    view_parser.add_argument("--host", default="127.0.0.1")
+    view_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    selftest_parser = sub.add_parser("selftest", help="Check the server against two loopback viewers")
+    selftest_parser.add_argument("--neurons", type=int, default=200)
+    selftest_parser.add_argument("--steps", type=int, default=300)
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.neurons, args.host, args.port, args.fps))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "selftest":
+        sys.exit(0 if asyncio.run(selftest(args.neurons, args.steps)) else 1)
+    elif view(args.host, args.port) is not None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,18 @@ defaults = {
     "UI Scale": 1.0,
 }
 
+# Slider tooltips, added by add_deferred_controls()
+tooltips = {
+    "Serotonin": "Glow decay duration (↑ serotonin → longer glow)",
+    "Dopamine": "Firing threshold (↑ dopamine → lower threshold → more firing)",
+    "GABA": "Refractory period duration (↑ GABA → longer refractory)",
+    "Acetylcholine": "AP speed (↑ acetylcholine → faster propagation)",
+    "Endorphins": "Glow decay damping (↑ endorphins → slower decay)",
+    "SSRI Mode": "Toggle SSRI effect on serotonin decay",
+}
+
+NETWORK_HEADER_TAG = "network_display_header"
+
 # Neon color palette
 neon_colors = {
     "purple": (162, 73, 157, 255),   # #A2499D
@@ -25,8 +37,8 @@ neon_colors = {
 }
 
 
-def add_neuroglow_controls(network_size_callback=None, ui_scale_callback=None, as_child=False):
-    # Neon/frosted glass sidebar theme
+def create_sidebar_theme():
+    """Create and return the neon/frosted glass sidebar theme."""
     with dpg.theme() as frosted_theme:
         with dpg.theme_component(dpg.mvAll):
             # Simulate frosted glass: semi-transparent, dark, neon border
@@ -45,6 +57,15 @@ def add_neuroglow_controls(network_size_callback=None, ui_scale_callback=None, a
             dpg.add_theme_color(dpg.mvThemeCol_Button, (30, 30, 40, 200), category=dpg.mvThemeCat_Core)
             dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, neon_colors["blue"], category=dpg.mvThemeCat_Core)
             dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, neon_colors["orange"], category=dpg.mvThemeCat_Core)
+    return frosted_theme
+
+
+def add_neuroglow_controls(network_size_callback=None, ui_scale_callback=None, as_child=False, defer_extras=False):
+    """
+    Build the sidebar controls. With defer_extras=True the tooltips, the
+    collapsed "Network & Display" header and the sidebar theme wait for
+    add_deferred_controls(), so fast startup can show the first frame sooner.
+    """
     # Controls sidebar, fixed width, no move/resize/titlebar
     parent_args = {'parent': dpg.last_item()} if as_child else {}
     with dpg.group(**parent_args):
@@ -63,32 +84,35 @@ def add_neuroglow_controls(network_size_callback=None, ui_scale_callback=None, a
             dpg.add_spacer(height=12)
             dpg.add_text("Neurotransmitter Levels", color=neon_colors["purple"])
             dpg.add_slider_float(label="Serotonin", tag="Serotonin", default_value=defaults["Serotonin"], min_value=0.0, max_value=1.0, format="%.2f")
-            with dpg.tooltip(parent="Serotonin"):
-                dpg.add_text("Glow decay duration (↑ serotonin → longer glow)")
             dpg.add_slider_float(label="Dopamine", tag="Dopamine", default_value=defaults["Dopamine"], min_value=0.0, max_value=1.0, format="%.2f")
-            with dpg.tooltip(parent="Dopamine"):
-                dpg.add_text("Firing threshold (↑ dopamine → lower threshold → more firing)")
             dpg.add_slider_float(label="GABA", tag="GABA", default_value=defaults["GABA"], min_value=0.0, max_value=1.0, format="%.2f")
-            with dpg.tooltip(parent="GABA"):
-                dpg.add_text("Refractory period duration (↑ GABA → longer refractory)")
             dpg.add_slider_float(label="Acetylcholine", tag="Acetylcholine", default_value=defaults["Acetylcholine"], min_value=0.0, max_value=1.0, format="%.2f")
-            with dpg.tooltip(parent="Acetylcholine"):
-                dpg.add_text("AP speed (↑ acetylcholine → faster propagation)")
             dpg.add_slider_float(label="Endorphins", tag="Endorphins", default_value=defaults["Endorphins"], min_value=0.0, max_value=1.0, format="%.2f")
-            with dpg.tooltip(parent="Endorphins"):
-                dpg.add_text("Glow decay damping (↑ endorphins → slower decay)")
             dpg.add_checkbox(label="SSRI Mode", tag="SSRI Mode", default_value=defaults["SSRI Mode"])
-            with dpg.tooltip(parent="SSRI Mode"):
-                dpg.add_text("Toggle SSRI effect on serotonin decay")
             dpg.add_spacer(height=8)
             dpg.add_text("SSRI Mode increases serotonin effect.", wrap=250, color=neon_colors["cyan"])
-        with dpg.collapsing_header(label="Network & Display", default_open=False):
-            dpg.add_text("Network Size", color=neon_colors["blue"])
-            dpg.add_slider_int(label="# Neurons", tag="Network Size", default_value=defaults["Network Size"], min_value=3, max_value=20, callback=network_size_callback)
-            dpg.add_spacer(height=8)
-            dpg.add_text("UI Scale", color=neon_colors["orange"])
-            dpg.add_slider_float(label="Scale", tag="UI Scale", default_value=defaults["UI Scale"], min_value=0.6, max_value=2.0, format="%.2fx", callback=ui_scale_callback)
-    dpg.bind_theme(frosted_theme)
+        dpg.add_collapsing_header(label="Network & Display", tag=NETWORK_HEADER_TAG, default_open=False)
+    if not defer_extras:
+        add_deferred_controls(network_size_callback=network_size_callback, ui_scale_callback=ui_scale_callback)
+
+
+def add_deferred_controls(network_size_callback=None, ui_scale_callback=None):
+    """Add the tooltips, "Network & Display" controls and sidebar theme skipped by defer_extras."""
+    for tag, text in tooltips.items():
+        with dpg.tooltip(parent=tag):
+            dpg.add_text(text)
+    with dpg.group(parent=NETWORK_HEADER_TAG):
+        dpg.add_text("Network Size", color=neon_colors["blue"])
+        dpg.add_slider_int(label="# Neurons", tag="Network Size", default_value=defaults["Network Size"], min_value=3, max_value=20, callback=network_size_callback)
+        dpg.add_spacer(height=8)
+        dpg.add_text("UI Scale", color=neon_colors["orange"])
+        dpg.add_slider_float(label="Scale", tag="UI Scale", default_value=defaults["UI Scale"], min_value=0.6, max_value=2.0, format="%.2fx", callback=ui_scale_callback)
+    dpg.bind_theme(create_sidebar_theme())
+
+
+def _value_or_none(tag):
+    # Deferred controls may not exist yet during fast startup
+    return dpg.get_value(tag) if dpg.does_item_exist(tag) else None
 
 
 def get_neurotransmitter_values():
@@ -104,8 +128,8 @@ def get_neurotransmitter_values():
             "Acetylcholine": float(dpg.get_value("Acetylcholine") or 0.5),
             "Endorphins": float(dpg.get_value("Endorphins") or 0.5),
             "SSRI Mode": ssri,
-            "Network Size": int(dpg.get_value("Network Size") or 8),
-            "UI Scale": float(dpg.get_value("UI Scale") or 1.0),
+            "Network Size": int(_value_or_none("Network Size") or 8),
+            "UI Scale": float(_value_or_none("UI Scale") or 1.0),
         }
     except Exception as e:
         return {
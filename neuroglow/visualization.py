@@ -1,6 +1,7 @@
 import dearpygui.dearpygui as dpg
 import math
-from neuroglow.simulation import Simulation, NeuronState
+import threading
+from neuroglow.simulation import Simulation, NeuronState, NeuronType
 
 CANVAS_TAG = "neuro_canvas"
 
@@ -14,11 +15,13 @@ NEON_COLORS = [
 
 # Color mapping for neuron types
 TYPE_COLORS = {
-    "excitatory": NEON_COLORS[0],  # Purple
-    "inhibitory": NEON_COLORS[2],  # Cyan
+    NeuronType.EXCITATORY: NEON_COLORS[0],  # Purple
+    NeuronType.INHIBITORY: NEON_COLORS[2],  # Cyan
 }
 
 sim = None
+# Result slot of the background build started by update_network_async()
+_pending_sim = None
 
 # --- Enhanced Neon/Glow Visualization ---
 def draw_network_sim():
@@ -206,10 +209,10 @@ def draw_network_sim():
     dpg.draw_line((legend_x+36, legend_y+138), (legend_x+106, legend_y+138), color=(255,40,200,170), thickness=5, parent=CANVAS_TAG)
     dpg.draw_text((legend_x+116, legend_y+130), "Active AP", color=(255,40,200,170), size=15, parent=CANVAS_TAG)
     # Neuron types legend
-    dpg.draw_circle(center=(legend_x+56, legend_y+168), radius=11, color=TYPE_COLORS["excitatory"], fill=(TYPE_COLORS["excitatory"][0], TYPE_COLORS["excitatory"][1], TYPE_COLORS["excitatory"][2], 110), thickness=3, parent=CANVAS_TAG)
-    dpg.draw_text((legend_x+78, legend_y+160), "Excitatory", color=TYPE_COLORS["excitatory"], size=15, parent=CANVAS_TAG)
-    dpg.draw_circle(center=(legend_x+56, legend_y+198), radius=11, color=TYPE_COLORS["inhibitory"], fill=(TYPE_COLORS["inhibitory"][0], TYPE_COLORS["inhibitory"][1], TYPE_COLORS["inhibitory"][2], 110), thickness=3, parent=CANVAS_TAG)
-    dpg.draw_text((legend_x+78, legend_y+190), "Inhibitory", color=TYPE_COLORS["inhibitory"], size=15, parent=CANVAS_TAG)
+    dpg.draw_circle(center=(legend_x+56, legend_y+168), radius=11, color=TYPE_COLORS[NeuronType.EXCITATORY], fill=(TYPE_COLORS[NeuronType.EXCITATORY][0], TYPE_COLORS[NeuronType.EXCITATORY][1], TYPE_COLORS[NeuronType.EXCITATORY][2], 110), thickness=3, parent=CANVAS_TAG)
+    dpg.draw_text((legend_x+78, legend_y+160), "Excitatory", color=TYPE_COLORS[NeuronType.EXCITATORY], size=15, parent=CANVAS_TAG)
+    dpg.draw_circle(center=(legend_x+56, legend_y+198), radius=11, color=TYPE_COLORS[NeuronType.INHIBITORY], fill=(TYPE_COLORS[NeuronType.INHIBITORY][0], TYPE_COLORS[NeuronType.INHIBITORY][1], TYPE_COLORS[NeuronType.INHIBITORY][2], 110), thickness=3, parent=CANVAS_TAG)
+    dpg.draw_text((legend_x+78, legend_y+190), "Inhibitory", color=TYPE_COLORS[NeuronType.INHIBITORY], size=15, parent=CANVAS_TAG)
 
     # --- Overlay: FPS and neuron count ---
     fps_text = f"FPS: {dpg.get_frame_rate():.1f} | Neurons: {len(sim.neurons)}"
@@ -227,7 +230,7 @@ def draw_network_sim():
         avg_strength = sum(strengths)/len(strengths) if strengths else 0.0
         label = (
             f"Neuron {idx}\n"
-            f"Type: {ntype}\n"
+            f"Type: {ntype.name.lower()}\n"
             f"State: {state.name}\n"
             f"Out Synapses: {out_count}\n"
             f"Avg Strength: {avg_strength:.2f}"
@@ -244,18 +247,42 @@ def setup_canvas(canvas_width=800, canvas_height=700, as_child=False):
 
 
 def update_network(network_size, neuro_params):
-    global sim
+    global sim, _pending_sim
+    _pending_sim = None
     sim = Simulation(n_neurons=network_size, neurotransmitters=neuro_params)
     draw_network_sim()
 
 
+def update_network_async(network_size, neuro_params):
+    """Build the Simulation on a worker thread; tick_and_draw() installs it once ready."""
+    global _pending_sim
+    pending = _pending_sim = {}
+    def build():
+        pending["sim"] = Simulation(n_neurons=network_size, neurotransmitters=dict(neuro_params))
+    threading.Thread(target=build, daemon=True).start()
+
+
 def tick_and_draw(neuro_params):
+    global sim, _pending_sim
+    if _pending_sim is not None and "sim" in _pending_sim:
+        sim = _pending_sim["sim"]
+        _pending_sim = None
     if sim:
         sim.set_neuro_params(neuro_params)
         sim.step()
         draw_network_sim()
 
 
+def tick_and_draw_ensemble(ensemble, member, neuro_params=None):
+    """Advance every network in an EnsembleSimulation and draw one member."""
+    global sim
+    if neuro_params is not None:
+        ensemble.set_neuro_params(neuro_params, member=member)
+    ensemble.step()
+    sim = ensemble.member(member)
+    draw_network_sim()
+
+
 def main(canvas_width=800, canvas_height=700):
     dpg.create_context()
     dpg.create_viewport(title="NeuroGlow", width=1024, height=768)